@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Evaluation Caches for OpenSearch PER Benchmark
+Reuses Bedrock ratings for (actual, expected) pairs that are identical or near-duplicates of pairs evaluated before
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+from functools import lru_cache
+from bedrock_evaluator import DEFAULT_MODEL_ID, evaluate_batch_with_bedrock, load_config
+
+# The semantic cache is optional and only enabled when its dependencies are installed
+try:
+    import hnswlib
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    hnswlib = None
+
+DEFAULT_EMBEDDING_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+DEFAULT_CACHE_FILE = '.cache/evals.pkl'
+DEFAULT_THRESHOLD = 0.90
+DEFAULT_EXACT_CACHE_FILE = '~/.cache/os-bench/bedrock.db'
+
+log = logging.getLogger(__name__)
+_cache_lock = threading.Lock()
+
+class ExactCache:
+    """Persistent cache of Bedrock evaluations keyed on a hash of the exact pair
+
+    Entries are stored in SQLite, with a dict in front for entries this
+    process has already read or written.
+    """
+
+    def __init__(self, cache_file=DEFAULT_EXACT_CACHE_FILE):
+        self.cache_file = os.path.expanduser(cache_file)
+        os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+        self.lock = threading.Lock()
+        self.memory = {}
+        self.db = sqlite3.connect(self.cache_file, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS evaluations (key TEXT PRIMARY KEY, evaluation TEXT NOT NULL)")
+        self.db.commit()
+
+    @staticmethod
+    def key(actual_output, expected_output, model_id):
+        """Hash of the pair and the model that rated it"""
+        text = f"{model_id}\x00{actual_output}\x00{expected_output}"
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get_many(self, keys):
+        """Return copies of the cached evaluations for the keys that have one, marked as cached"""
+        with self.lock:
+            found = {key: self.memory[key] for key in keys if key in self.memory}
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            # Stay below SQLite's limit on bound parameters
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self.db.execute(f"SELECT key, evaluation FROM evaluations WHERE key IN ({placeholders})", chunk)
+                for key, evaluation in rows:
+                    found[key] = self.memory[key] = json.loads(evaluation)
+        return {key: dict(evaluation, cached=True) for key, evaluation in found.items()}
+
+    def put_many(self, evaluations):
+        """Store evaluations by key"""
+        with self.lock:
+            self.memory.update(evaluations)
+            self.db.executemany(
+                "INSERT OR REPLACE INTO evaluations (key, evaluation) VALUES (?, ?)",
+                [(key, json.dumps(evaluation)) for key, evaluation in evaluations.items()]
+            )
+            self.db.commit()
+
+class SemanticCache:
+    """Nearest-neighbour cache of Bedrock evaluations keyed on sentence embeddings
+
+    Actual outputs are indexed in an HNSW index. A lookup is a hit when both the
+    actual output and the expected output of a cached pair have a cosine
+    similarity of at least the threshold with the pair being evaluated.
+    """
+
+    def __init__(self, cache_file=DEFAULT_CACHE_FILE, threshold=DEFAULT_THRESHOLD,
+                 model_name=DEFAULT_EMBEDDING_MODEL, candidates=5):
+        self.cache_file = cache_file
+        self.threshold = threshold
+        self.candidates = candidates
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.lock = threading.Lock()
+        self.actual_embeddings = []
+        self.expected_embeddings = []
+        self.evaluations = []
+        # Embeddings computed ahead of time, keyed by text
+        self.known_embeddings = {}
+        self.index = None
+        self._load()
+
+    def _load(self):
+        """Load cached evaluations from disk and build the index"""
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'rb') as f:
+                    data = pickle.load(f)
+                self.actual_embeddings = list(data['actual_embeddings'])
+                self.expected_embeddings = list(data['expected_embeddings'])
+                self.evaluations = data['evaluations']
+                log.info("Loaded %s cached evaluations from %s", len(self.evaluations), self.cache_file)
+            except Exception as e:
+                log.error("Error loading semantic cache from %s: %s", self.cache_file, e)
+                self.actual_embeddings, self.expected_embeddings, self.evaluations = [], [], []
+
+        self.index = hnswlib.Index(space='cosine', dim=self.dim)
+        self.index.init_index(max_elements=max(1024, 2 * len(self.evaluations)), ef_construction=200, M=16)
+        if self.evaluations:
+            self.index.add_items(np.asarray(self.actual_embeddings), list(range(len(self.evaluations))))
+
+    def embed(self, texts):
+        """Encode texts as unit-length embeddings in a single batched call"""
+        return self.model.encode(texts, batch_size=64, normalize_embeddings=True, show_progress_bar=False)
+
+    def precompute(self, texts):
+        """Embed texts that lookups will need later, such as expected outputs, in one batch"""
+        missing = [text for text in dict.fromkeys(texts) if text not in self.known_embeddings]
+        if missing:
+            log.info("Precomputing embeddings for %s texts", len(missing))
+            self.known_embeddings.update(zip(missing, self.embed(missing)))
+
+    def _embed_all(self, texts):
+        """Embeddings for texts, encoding only those not precomputed, in one batch"""
+        missing = [text for text in dict.fromkeys(texts) if text not in self.known_embeddings]
+        fresh = dict(zip(missing, self.embed(missing))) if missing else {}
+        return [self.known_embeddings[text] if text in self.known_embeddings else fresh[text] for text in texts]
+
+    def lookup_many(self, pairs):
+        """Find cached evaluations for near-duplicates of several pairs
+
+        Args:
+            pairs (list[tuple[str, str]]): (actual_output, expected_output) pairs
+
+        Returns:
+            list[tuple]: Per pair, (evaluation or None, (actual_embedding, expected_embedding));
+                the embeddings can be passed to add() on a miss
+        """
+        embeddings = self._embed_all([text for pair in pairs for text in pair])
+        return [
+            (self._nearest(embeddings[2 * i], embeddings[2 * i + 1]), (embeddings[2 * i], embeddings[2 * i + 1]))
+            for i in range(len(pairs))
+        ]
+
+    def lookup(self, actual_output, expected_output):
+        """Find a cached evaluation for a near-duplicate pair, see lookup_many"""
+        return self.lookup_many([(actual_output, expected_output)])[0]
+
+    def _nearest(self, actual_embedding, expected_embedding):
+        """Return a copy of the cached evaluation matching both embeddings, if any"""
+        with self.lock:
+            if not self.evaluations:
+                return None
+            k = min(self.candidates, len(self.evaluations))
+            labels, distances = self.index.knn_query(actual_embedding, k=k)
+            for label, distance in zip(labels[0], distances[0]):
+                if 1 - distance < self.threshold:
+                    break
+                if float(np.dot(self.expected_embeddings[label], expected_embedding)) >= self.threshold:
+                    return dict(self.evaluations[label], cached=True)
+        return None
+
+    def add(self, embeddings, evaluation):
+        """Store an evaluation for the pair the embeddings were computed from"""
+        actual_embedding, expected_embedding = embeddings
+        with self.lock:
+            label = len(self.evaluations)
+            if label >= self.index.get_max_elements():
+                self.index.resize_index(2 * self.index.get_max_elements())
+            self.index.add_items(actual_embedding[None, :], [label])
+            self.actual_embeddings.append(actual_embedding)
+            self.expected_embeddings.append(expected_embedding)
+            self.evaluations.append(evaluation)
+
+    def save(self):
+        """Persist cached evaluations to disk"""
+        with self.lock:
+            data = {
+                'actual_embeddings': np.asarray(self.actual_embeddings),
+                'expected_embeddings': np.asarray(self.expected_embeddings),
+                'evaluations': list(self.evaluations)
+            }
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            with open(self.cache_file, 'wb') as f:
+                pickle.dump(data, f)
+            log.info("Saved %s cached evaluations to %s", len(data['evaluations']), self.cache_file)
+        except Exception as e:
+            log.error("Error saving semantic cache to %s: %s", self.cache_file, e)
+
+@lru_cache(maxsize=1)
+def _get_semantic_cache():
+    """Return the process-wide semantic cache, or None if it is disabled"""
+    config = load_config()
+    if not config.get('SEMANTIC_CACHE', False):
+        return None
+    if hnswlib is None:
+        log.warning("SEMANTIC_CACHE is enabled but sentence-transformers/hnswlib are not installed; caching disabled")
+        return None
+    return SemanticCache(
+        cache_file=config.get('SEMANTIC_CACHE_FILE', DEFAULT_CACHE_FILE),
+        threshold=config.get('SEMANTIC_CACHE_THRESHOLD', DEFAULT_THRESHOLD),
+        model_name=config.get('SEMANTIC_CACHE_MODEL', DEFAULT_EMBEDDING_MODEL)
+    )
+
+def get_semantic_cache():
+    """Return the semantic cache, creating it on first use"""
+    with _cache_lock:
+        return _get_semantic_cache()
+
+@lru_cache(maxsize=1)
+def _get_exact_cache():
+    """Return the process-wide exact cache, or None if it is disabled"""
+    config = load_config()
+    if not config.get('EVAL_CACHE', False):
+        return None
+    cache_file = config.get('EVAL_CACHE_FILE', DEFAULT_EXACT_CACHE_FILE)
+    try:
+        return ExactCache(cache_file)
+    except Exception as e:
+        log.error("Error opening evaluation cache %s, caching disabled: %s", cache_file, e)
+        return None
+
+def get_exact_cache():
+    """Return the exact evaluation cache, opening it on first use"""
+    with _cache_lock:
+        return _get_exact_cache()
+
+def _is_cacheable(evaluation):
+    """Only successful ratings are worth reusing"""
+    return "error" not in evaluation and evaluation.get("rating", 0) > 0
+
+def evaluate_with_cache(actual_output, expected_output, model_id=None):
+    """
+    Evaluate agent output like evaluate_with_bedrock, reusing cached ratings for identical or near-duplicate pairs
+
+    Args:
+        actual_output (str): The actual output from the agent
+        expected_output (str): The expected output to compare against
+        model_id (str, optional): The Bedrock model ID to use for evaluation
+
+    Returns:
+        dict: Evaluation results, with "cached": True on a cache hit
+    """
+    return evaluate_batch_with_cache([(actual_output, expected_output)], model_id)[0]
+
+def evaluate_batch_with_cache(pairs, model_id=None):
+    """
+    Evaluate pairs like evaluate_batch_with_bedrock, only sending cache misses to Bedrock
+
+    Identical pairs are looked up in the exact cache first, the rest in the
+    semantic cache when it is enabled.
+
+    Args:
+        pairs (list[tuple[str, str]]): (actual_output, expected_output) pairs
+        model_id (str, optional): The Bedrock model ID to use for evaluation
+
+    Returns:
+        list[dict]: Evaluation results in the same order as pairs
+    """
+    cache = get_exact_cache()
+    if cache is None:
+        return _evaluate_batch_semantic(pairs, model_id)
+
+    rating_model = model_id or load_config().get('BEDROCK_MODEL_ID', DEFAULT_MODEL_ID)
+    keys = [ExactCache.key(actual_output, expected_output, rating_model) for actual_output, expected_output in pairs]
+    hits = cache.get_many(keys)
+    misses = [i for i, key in enumerate(keys) if key not in hits]
+    log.info("Evaluation cache: %s hits, %s misses", len(pairs) - len(misses), len(misses))
+
+    evaluations = [hits.get(key) for key in keys]
+    if misses:
+        fresh = _evaluate_batch_semantic([pairs[i] for i in misses], model_id)
+        for i, evaluation in zip(misses, fresh):
+            evaluations[i] = evaluation
+        cache.put_many({
+            keys[i]: evaluation for i, evaluation in zip(misses, fresh)
+            if _is_cacheable(evaluation) and not evaluation.get("cached")
+        })
+    return evaluations
+
+def _evaluate_batch_semantic(pairs, model_id=None):
+    """Evaluate pairs, reusing ratings for near-duplicates if the semantic cache is enabled"""
+    cache = get_semantic_cache()
+    if cache is None:
+        return evaluate_batch_with_bedrock(pairs, model_id)
+
+    evaluations = [None] * len(pairs)
+    misses = []
+    for i, (evaluation, embeddings) in enumerate(cache.lookup_many(pairs)):
+        if evaluation is not None:
+            evaluations[i] = evaluation
+        else:
+            misses.append((i, embeddings))
+    log.info("Semantic cache: %s hits, %s misses", len(pairs) - len(misses), len(misses))
+
+    if misses:
+        fresh = evaluate_batch_with_bedrock([pairs[i] for i, _ in misses], model_id)
+        for (i, embeddings), evaluation in zip(misses, fresh):
+            evaluations[i] = evaluation
+            if _is_cacheable(evaluation):
+                cache.add(embeddings, evaluation)
+    return evaluations
+
+def precompute_embeddings(test_cases):
+    """Embed all expected outputs up front in one batch, if the semantic cache is enabled
+
+    Args:
+        test_cases (list[dict]): Test cases with 'expected_output' fields
+    """
+    cache = get_semantic_cache()
+    if cache is not None:
+        cache.precompute([test_case['expected_output'] for test_case in test_cases])
+
+def save_cache():
+    """Persist the semantic cache if it is enabled"""
+    cache = get_semantic_cache()
+    if cache is not None:
+        cache.save()
@@ -8,17 +8,319 @@ import boto3
 import json
 import logging
 import os
+import itertools
+import threading
 import yaml
+from functools import lru_cache
+from botocore.config import Config
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+log = logging.getLogger(__name__)
+
+# One shared session so credential resolution and refresh happen once per process
+_session = boto3.session.Session()
+_client_lock = threading.Lock()
+_region_lock = threading.Lock()
+
+DEFAULT_MODEL_ID = 'us.anthropic.claude-3-5-haiku-20241022-v1:0'
+
+_EVALUATION_CRITERIA = """1. Evaluate how well the actual response matches the expected output in terms of:
+   - Accuracy: Does the response contain correct information aligned with the expected output?
+   - Completeness: Does it cover all the key points from the expected output?
+   - Relevance: How relevant is the response to the expected output?
+
+2. Provide a rating on a scale of 1-5:
+   - 1: Poor match - significant discrepancies or missing information
+   - 2: Below average match - major gaps or inaccuracies 
+   - 3: Average match - contains core information but with some gaps
+   - 4: Good match - covers most points accurately
+   - 5: Excellent match - fully captures the essence of the expected output
+
+3. Explain your rating with specific examples from both texts."""
+
+# Static instructions go in the system prompt, so an optional cache point can
+# follow them; with the tools they are still below Claude 3.5 Haiku's minimum of
+# 2048 cacheable tokens, so BEDROCK_PROMPT_CACHE is off by default
+_SYSTEM_RUBRIC = f"""You are an expert evaluator comparing an AI agent's response against the expected output.
+The user gives you the actual AI agent response and the expected output.
+
+{_EVALUATION_CRITERIA}
+
+Submit your evaluation with the submit_evaluation tool."""
+
+_BATCH_SYSTEM_RUBRIC = f"""You are an expert evaluator comparing AI agent responses against their expected outputs.
+The user gives you numbered pairs of an actual AI agent response and an expected output.
+Evaluate each pair independently.
+
+For each pair:
+{_EVALUATION_CRITERIA}
+
+Submit your evaluations with the submit_evaluations tool, with exactly one
+entry per pair in the same order as the pairs."""
+
+_PROMPT_TEMPLATE = """## Actual AI Agent Response:
+{actual_output}
+
+## Expected Output:
+{expected_output}
+"""
+
+_BATCH_PROMPT_TEMPLATE = """Evaluate the following {count} pairs.
+
+{pairs}"""
+
+_PAIR_TEMPLATE = """### Pair {number}
+#### Actual AI Agent Response:
+{actual_output}
+
+#### Expected Output:
+{expected_output}
+"""
+
+# maxTokens is per evaluation; batched requests scale it by the number of pairs
+_INFERENCE_CONFIG = {
+    "maxTokens": 400,
+    "temperature": 0,
+    "topP": 0.9
+}
+
+_EVALUATION_PROPERTIES = {
+    "rating": {"type": "integer", "minimum": 1, "maximum": 5, "description": "Rating on a scale of 1-5"},
+    "reasoning": {"type": "string", "description": "Explanation of the rating with specific examples from both texts"},
+    "accuracy": {"type": "string", "description": "Brief assessment of accuracy"},
+    "completeness": {"type": "string", "description": "Brief assessment of completeness"},
+    "relevance": {"type": "string", "description": "Brief assessment of relevance"}
+}
+
+# Forcing a tool call makes the model return the evaluation as a structured dict
+_EVALUATION_TOOL_CONFIG = {
+    "tools": [{
+        "toolSpec": {
+            "name": "submit_evaluation",
+            "description": "Submit the evaluation of the AI agent response",
+            "inputSchema": {"json": {
+                "type": "object",
+                "properties": _EVALUATION_PROPERTIES,
+                "required": list(_EVALUATION_PROPERTIES)
+            }}
+        }
+    }],
+    "toolChoice": {"tool": {"name": "submit_evaluation"}}
+}
+
+_BATCH_EVALUATION_TOOL_CONFIG = {
+    "tools": [{
+        "toolSpec": {
+            "name": "submit_evaluations",
+            "description": "Submit one evaluation per pair, in the same order as the pairs",
+            "inputSchema": {"json": {
+                "type": "object",
+                "properties": {
+                    "evaluations": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "pair": {"type": "integer", "description": "Pair number"},
+                                **_EVALUATION_PROPERTIES
+                            },
+                            "required": ["pair", *_EVALUATION_PROPERTIES]
+                        }
+                    }
+                },
+                "required": ["evaluations"]
+            }}
+        }
+    }],
+    "toolChoice": {"tool": {"name": "submit_evaluations"}}
+}
+
+class _JsonObjectScanner:
+    """Incrementally finds the outermost JSON object in text that arrives in chunks
+    
+    Scans each character once from the first '{' counting brace depth, ignoring
+    braces inside string literals, so malformed output cannot trigger regex
+    backtracking and streamed output can be checked as it arrives.
+    """
+    def __init__(self):
+        self._chunks = []
+        self._consumed = 0
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+    
+    def feed(self, chunk):
+        """Add a chunk of text; return the JSON object once it is complete, else None"""
+        self._chunks.append(chunk)
+        offset = self._consumed
+        self._consumed += len(chunk)
+        begin = 0
+        if self._start is None:
+            begin = chunk.find('{')
+            if begin == -1:
+                return None
+            self._start = offset + begin
+        for i in range(begin, len(chunk)):
+            char = chunk[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    return "".join(self._chunks)[self._start:offset + i + 1]
+        return None
+
+def _extract_json(text):
+    """Return the outermost JSON object embedded in text, or None if there is none"""
+    return _JsonObjectScanner().feed(text)
+
+@lru_cache(maxsize=1)
 def load_config():
-    """Load configuration from config.yaml"""
+    """Load configuration from config.yaml, once per process"""
     try:
         with open('config.yaml', 'r') as file:
-            return yaml.safe_load(file)
+            return yaml.load(file, Loader=SafeLoader)
     except Exception as e:
-        logging.error(f"Error loading config: {e}")
+        log.error("Error loading config: %s", e)
         return {}
 
+@lru_cache(maxsize=1)
+def _region_cycle():
+    """Cycle over the configured Bedrock regions"""
+    config = load_config()
+    regions = config.get('BEDROCK_REGIONS') or [config.get('AWS_REGION', 'us-east-1')]
+    return itertools.cycle(regions)
+
+def _next_region():
+    """Return the region for the next Bedrock call
+    
+    Calls are spread round-robin over BEDROCK_REGIONS (default: just AWS_REGION)
+    so concurrent evaluations draw on each region's request and token quotas.
+    """
+    with _region_lock:
+        return next(_region_cycle())
+
+@lru_cache(maxsize=8)
+def _get_bedrock_client(region_name):
+    """Return the shared Bedrock runtime client for a region
+    
+    boto3 clients are thread-safe once created, but creating them from a
+    shared session is not, so construction is serialized.
+    """
+    # Sized for the evaluation pool, which is what issues the Bedrock calls
+    config = load_config()
+    eval_workers = config.get('EVAL_CONCURRENCY', config.get('MAX_CONCURRENCY', 4))
+    client_config = Config(
+        retries={'max_attempts': 5, 'mode': 'adaptive'},
+        max_pool_connections=max(10, eval_workers * 2),
+        tcp_keepalive=True
+    )
+    with _client_lock:
+        bedrock_client = _session.client('bedrock-runtime', region_name=region_name, config=client_config)
+    log.info("Initialized Bedrock client in %s region", region_name)
+    return bedrock_client
+
+def _system_prompt(rubric):
+    """Build the converse system blocks for a rubric, with a prompt cache point if enabled"""
+    blocks = [{"text": rubric}]
+    if load_config().get('BEDROCK_PROMPT_CACHE', False):
+        blocks.append({"cachePoint": {"type": "default"}})
+    return blocks
+
+def _converse(bedrock_client, tool_name, **request):
+    """Call the Bedrock converse API and return the response in the converse shape
+    
+    Unless BEDROCK_STREAMING is disabled, the reply is read with converse_stream
+    and reading stops as soon as the tool input is complete, instead of waiting
+    for the rest of the generation. A JSON object in the reply text only ends
+    the read early when no toolConfig was sent; otherwise the model may still
+    call the tool after its preamble, so text is read through to messageStop.
+    
+    Args:
+        bedrock_client: The Bedrock runtime client
+        tool_name (str): Name of the tool the model is asked to call
+        **request: Arguments for converse / converse_stream
+        
+    Returns:
+        dict: Response with the assistant message under output.message
+    """
+    if not load_config().get('BEDROCK_STREAMING', True):
+        return bedrock_client.converse(**request)
+    
+    stream = bedrock_client.converse_stream(**request)["stream"]
+    text_chunks = []
+    text_scanner = _JsonObjectScanner()
+    stop_on_text = "toolConfig" not in request
+    tool_use = None
+    tool_scanner = None
+    try:
+        for event in stream:
+            if "contentBlockStart" in event:
+                start = event["contentBlockStart"].get("start", {}).get("toolUse")
+                if start and start.get("name") == tool_name:
+                    tool_use = {"toolUseId": start.get("toolUseId"), "name": tool_name}
+                    tool_scanner = _JsonObjectScanner()
+            elif "contentBlockDelta" in event:
+                delta = event["contentBlockDelta"].get("delta", {})
+                if "toolUse" in delta and tool_scanner is not None and "input" not in tool_use:
+                    tool_input = tool_scanner.feed(delta["toolUse"].get("input", ""))
+                    if tool_input:
+                        tool_use["input"] = json.loads(tool_input)
+                        break
+                elif "text" in delta:
+                    text_chunks.append(delta["text"])
+                    if stop_on_text and tool_use is None and text_scanner.feed(delta["text"]):
+                        break
+            elif "messageStop" in event:
+                break
+    finally:
+        stream.close()
+    
+    content = []
+    if text_chunks:
+        content.append({"text": "".join(text_chunks)})
+    if tool_use is not None and "input" in tool_use:
+        content.append({"toolUse": tool_use})
+    return {"output": {"message": {"role": "assistant", "content": content}}}
+
+def _message_text(message):
+    """Concatenate the text blocks of a Bedrock converse message"""
+    return "".join(block.get("text", "") for block in message.get("content", []))
+
+def _parse_tool_input(message, tool_name):
+    """Return the structured input of a tool call in a Bedrock converse message
+    
+    Falls back to a JSON object embedded in the message text for models that
+    answer in text instead of calling the tool.
+    
+    Raises:
+        ValueError: If the message contains neither a tool call nor JSON
+        json.JSONDecodeError: If the embedded JSON is invalid
+    """
+    for block in message.get("content", []):
+        tool_use = block.get("toolUse")
+        if tool_use and tool_use.get("name") == tool_name:
+            return tool_use.get("input", {})
+    
+    json_str = _extract_json(_message_text(message))
+    if not json_str:
+        raise ValueError("No evaluation found in Bedrock response")
+    return json.loads(json_str)
+
 def evaluate_with_bedrock(actual_output, expected_output, model_id=None):
     """
     Evaluate agent output against expected output using Amazon Bedrock
@@ -33,55 +335,20 @@ def evaluate_with_bedrock(actual_output, expected_output, model_id=None):
     """
     config = load_config()
     if model_id is None:
-        model_id = config.get('BEDROCK_MODEL_ID', 'us.anthropic.claude-3-5-sonnet-20241022-v2:0')
-    region_name = config.get('AWS_REGION', 'us-east-1')
-    logging.info(f"Using Bedrock model: {model_id} in region: {region_name}")
+        model_id = config.get('BEDROCK_MODEL_ID', DEFAULT_MODEL_ID)
+    region_name = _next_region()
+    log.info("Using Bedrock model: %s in region: %s", model_id, region_name)
 
     try:
-        bedrock_client = boto3.client('bedrock-runtime', region_name=region_name)
-        logging.info(f"Initialized Bedrock client in {region_name} region")
+        bedrock_client = _get_bedrock_client(region_name)
     except Exception as e:
-        logging.error(f"Error initializing Bedrock client: {e}")
+        log.error("Error initializing Bedrock client: %s", e)
         return {
             "error": f"Failed to initialize Bedrock client: {str(e)}",
             "rating": 0,
             "reasoning": "Evaluation failed due to Bedrock client initialization error"
         }
-    prompt = f"""
-You are an expert evaluator comparing an AI agent's response against the expected output.
-
-## Actual AI Agent Response:
-{actual_output}
-
-## Expected Output:
-{expected_output}
-
-## Your Task:
-1. Evaluate how well the actual response matches the expected output in terms of:
-   - Accuracy: Does the response contain correct information aligned with the expected output?
-   - Completeness: Does it cover all the key points from the expected output?
-   - Relevance: How relevant is the response to the expected output?
-
-2. Provide a rating on a scale of 1-5:
-   - 1: Poor match - significant discrepancies or missing information
-   - 2: Below average match - major gaps or inaccuracies 
-   - 3: Average match - contains core information but with some gaps
-   - 4: Good match - covers most points accurately
-   - 5: Excellent match - fully captures the essence of the expected output
-
-3. Explain your rating with specific examples from both texts.
-
-Format your response as a valid JSON with the following structure:
-{{
-  "rating": [1-5 as a number],
-  "reasoning": [your detailed explanation],
-  "accuracy": [brief assessment of accuracy],
-  "completeness": [brief assessment of completeness],
-  "relevance": [brief assessment of relevance]
-}}
-
-The JSON must be valid and properly formatted.
-"""
+    prompt = _PROMPT_TEMPLATE.format(actual_output=actual_output, expected_output=expected_output)
     payload = {
         "messages": [
             {
@@ -89,79 +356,163 @@ The JSON must be valid and properly formatted.
                 "content": [{"text": prompt}]
             }
         ],
-        "inferenceConfig": {
-            "maxTokens": 2000,
-            "temperature": 0,
-            "topP": 0.9
-        }
+        "inferenceConfig": _INFERENCE_CONFIG
     }
 
     try:
-        logging.info(f"Calling Bedrock with model: {model_id}")
-        response = bedrock_client.converse(
+        log.info("Calling Bedrock with model: %s", model_id)
+        response = _converse(
+            bedrock_client,
+            "submit_evaluation",
             modelId=model_id,
             messages=payload["messages"],
-            inferenceConfig=payload["inferenceConfig"]
+            inferenceConfig=payload["inferenceConfig"],
+            system=_system_prompt(_SYSTEM_RUBRIC),
+            toolConfig=_EVALUATION_TOOL_CONFIG
         )
         
-        if "output" in response and "message" in response["output"]:
-            message = response["output"]["message"]
-            
-            if "content" in message:
-                response_text = ""
-                for content_block in message["content"]:
-                    if "text" in content_block:
-                        response_text += content_block["text"]
-                try:
-                    import re
-                    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                    
-                    if json_match:
-                        json_str = json_match.group()
-                        evaluation = json.loads(json_str)
-                        
-                        if "rating" in evaluation:
-                            evaluation["rating"] = int(evaluation["rating"])
-                        
-                        return evaluation
-                    else:
-                        logging.error("No JSON found in Bedrock response")
-                        return {
-                            "error": "No JSON found in Bedrock response",
-                            "rating": 0,
-                            "reasoning": "The Bedrock model did not return a properly formatted JSON response"
-                        }
-                        
-                except json.JSONDecodeError as e:
-                    logging.error(f"Error parsing Bedrock response as JSON: {e}")
-                    return {
-                        "error": f"Invalid JSON in Bedrock response: {str(e)}",
-                        "rating": 0,
-                        "reasoning": "The Bedrock model returned invalid JSON"
-                    }
-            else:
-                logging.error("No content in Bedrock message")
-                return {
-                    "error": "No content in Bedrock message",
-                    "rating": 0,
-                    "reasoning": "The Bedrock model response was missing content"
-                }
-        else:
-            logging.error("Invalid response structure from Bedrock")
+        if "output" not in response or "message" not in response["output"]:
+            log.error("Invalid response structure from Bedrock")
             return {
                 "error": "Invalid response structure from Bedrock",
                 "rating": 0,
                 "reasoning": "The Bedrock API response did not contain expected fields"
             }
+        message = response["output"]["message"]
+        
+        if "content" not in message:
+            log.error("No content in Bedrock message")
+            return {
+                "error": "No content in Bedrock message",
+                "rating": 0,
+                "reasoning": "The Bedrock model response was missing content"
+            }
+        
+        try:
+            evaluation = _parse_tool_input(message, "submit_evaluation")
+        # JSONDecodeError is a ValueError, so it is handled first
+        except json.JSONDecodeError as e:
+            log.error("Error parsing Bedrock response as JSON: %s", e)
+            return {
+                "error": f"Invalid JSON in Bedrock response: {str(e)}",
+                "rating": 0,
+                "reasoning": "The Bedrock model returned invalid JSON"
+            }
+        except ValueError as e:
+            log.error("%s", e)
+            return {
+                "error": str(e),
+                "rating": 0,
+                "reasoning": "The Bedrock model did not return a structured evaluation"
+            }
+        
+        if "rating" in evaluation:
+            evaluation["rating"] = int(evaluation["rating"])
+        return evaluation
             
     except Exception as e:
-        logging.error(f"Error calling Bedrock: {e}")
+        log.error("Error calling Bedrock: %s", e)
         return {
             "error": f"Error calling Bedrock API: {str(e)}",
             "rating": 0,
             "reasoning": "Evaluation failed due to Bedrock API error"
         }
 
+def evaluate_batch_with_bedrock(pairs, model_id=None):
+    """
+    Evaluate several agent outputs against their expected outputs in one Bedrock request
+    
+    The pairs are rendered into a single enumerated prompt and the model is asked
+    for one evaluation per pair. If the batched response cannot be parsed, each
+    pair is evaluated individually with evaluate_with_bedrock instead. If the
+    request itself fails, e.g. when throttled after retries, every pair gets an
+    error evaluation rather than adding one more request per pair.
+    
+    Args:
+        pairs (list[tuple[str, str]]): (actual_output, expected_output) pairs
+        model_id (str, optional): The Bedrock model ID to use for evaluation
+        
+    Returns:
+        list[dict]: Evaluation results in the same order as pairs
+    """
+    if len(pairs) == 1:
+        return [evaluate_with_bedrock(pairs[0][0], pairs[0][1], model_id)]
+    
+    config = load_config()
+    if model_id is None:
+        model_id = config.get('BEDROCK_MODEL_ID', DEFAULT_MODEL_ID)
+    region_name = _next_region()
+    
+    prompt = _BATCH_PROMPT_TEMPLATE.format(
+        count=len(pairs),
+        pairs="\n".join(
+            _PAIR_TEMPLATE.format(number=i, actual_output=actual_output, expected_output=expected_output)
+            for i, (actual_output, expected_output) in enumerate(pairs, start=1)
+        )
+    )
+    
+    try:
+        log.info("Calling Bedrock with model: %s for a batch of %s evaluations", model_id, len(pairs))
+        response = _converse(
+            _get_bedrock_client(region_name),
+            "submit_evaluations",
+            modelId=model_id,
+            messages=[{"role": "user", "content": [{"text": prompt}]}],
+            inferenceConfig={**_INFERENCE_CONFIG, "maxTokens": min(8192, _INFERENCE_CONFIG["maxTokens"] * len(pairs))},
+            system=_system_prompt(_BATCH_SYSTEM_RUBRIC),
+            toolConfig=_BATCH_EVALUATION_TOOL_CONFIG
+        )
+    except Exception as e:
+        log.error("Error calling Bedrock for a batch of %s evaluations: %s", len(pairs), e)
+        return [
+            {
+                "error": f"Error calling Bedrock API: {str(e)}",
+                "rating": 0,
+                "reasoning": "Evaluation failed due to Bedrock API error"
+            }
+            for _ in pairs
+        ]
+    
+    try:
+        message = response.get("output", {}).get("message", {})
+        return _order_evaluations(_parse_tool_input(message, "submit_evaluations").get("evaluations", []), len(pairs))
+    except ValueError as e:
+        # Includes json.JSONDecodeError
+        log.warning("Could not parse batched Bedrock evaluation (%s), evaluating %s pairs individually", e, len(pairs))
+        return [evaluate_with_bedrock(actual_output, expected_output, model_id) for actual_output, expected_output in pairs]
+
+def _order_evaluations(evaluations, count):
+    """Put batched evaluations in pair order using their pair numbers
+    
+    Args:
+        evaluations (list[dict]): Evaluations from the submit_evaluations tool
+        count (int): Number of pairs in the batch
+        
+    Returns:
+        list[dict]: The evaluations without their pair numbers, in pair order
+        
+    Raises:
+        ValueError: If the evaluations do not cover pairs 1 to count exactly once
+    """
+    if len(evaluations) != count:
+        raise ValueError(f"Expected {count} evaluations, got {len(evaluations)}")
+    
+    ordered = [None] * count
+    for evaluation in evaluations:
+        if not isinstance(evaluation, dict):
+            raise ValueError(f"Invalid evaluation in batch: {evaluation!r}")
+        number = evaluation.pop("pair", None)
+        try:
+            index = int(number) - 1
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid pair number in batched evaluation: {number!r}")
+        if not 0 <= index < count or ordered[index] is not None:
+            raise ValueError(f"Unexpected pair number in batched evaluation: {number}")
+        if "rating" in evaluation:
+            evaluation["rating"] = int(evaluation["rating"])
+        ordered[index] = evaluation
+    return ordered
+
 
 if __name__ == "__main__":
     actual = "The cluster contains multiple system indices related to OpenSearch ML functionality. All indices are healthy with green status."
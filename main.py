@@ -3,17 +3,99 @@ import json
 import time
 import logging
 import os
+import heapq
+import itertools
+import random
+import threading
+import orjson
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from opensearchpy import OpenSearch
+from opensearchpy.exceptions import SerializationError, TransportError
+from opensearchpy.serializer import JSONSerializer
 from opensearch_py_ml.ml_commons import MLCommonClient
-from bedrock_evaluator import evaluate_with_bedrock
+from bedrock_cache import evaluate_batch_with_cache, precompute_embeddings, save_cache
+
+# The libyaml-based loader is much faster, but only present if PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
+log = logging.getLogger(__name__)
+
+# ML Commons task states
+STATE_CREATED = 'CREATED'
+STATE_RUNNING = 'RUNNING'
+STATE_COMPLETED = 'COMPLETED'
+STATE_FAILED = 'FAILED'
+STATE_CANCELLED = 'CANCELLED'
+# States after which a task will not change any more, and states it is still working in
+_TERMINAL = frozenset({STATE_COMPLETED, STATE_FAILED, STATE_CANCELLED})
+_PENDING = frozenset({STATE_CREATED, STATE_RUNNING})
+
+class ORJSONSerializer(JSONSerializer):
+    """opensearch-py serializer backed by orjson
+    
+    Task polling parses a response on every attempt; orjson does this several
+    times faster than the stdlib json module. Types orjson does not handle
+    natively fall back to JSONSerializer.default.
+    """
+    def loads(self, s):
+        try:
+            return orjson.loads(s)
+        except (orjson.JSONDecodeError, TypeError) as e:
+            raise SerializationError(s, e)
+    
+    def dumps(self, data):
+        # don't serialize strings
+        if isinstance(data, str):
+            return data
+        
+        try:
+            # Non-string keys are stringified, as the stock JSONSerializer does
+            return orjson.dumps(data, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except (TypeError, orjson.JSONEncodeError) as e:
+            raise SerializationError(data, e)
+
+def _pretty_json(data):
+    """Indented JSON for debug logs; only call behind an isEnabledFor(DEBUG) check"""
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str).decode('utf-8')
+
+class TaskDurationEstimator:
+    """Exponentially weighted moving average of completed agent task durations
+    
+    Used to hold off the first poll of a new task until it is likely to be
+    nearly done. Shared by all worker threads.
+    """
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.average = None
+        self._lock = threading.Lock()
+    
+    def update(self, duration):
+        """Record the duration in seconds of a completed task"""
+        with self._lock:
+            if self.average is None:
+                self.average = duration
+            else:
+                self.average = self.alpha * duration + (1 - self.alpha) * self.average
+    
+    def initial_delay(self, fraction=0.8):
+        """Seconds to wait before the first poll, 0 until a task has completed"""
+        with self._lock:
+            return fraction * self.average if self.average else 0
 
 class OpenSearchClient:
+    """OpenSearch and ML Commons clients for the benchmark
+    
+    The underlying connection pool keeps up to POOL_MAXSIZE persistent
+    connections, so a single instance can be shared by all worker threads.
+    """
     def __init__(self, config):
         self.host = config['OPENSEARCH_HOST']
         self.port = config['OPENSEARCH_PORT']
@@ -23,10 +105,18 @@ class OpenSearchClient:
         protocol = config.get('OPENSEARCH_PROTOCOL', 'https').lower()
         use_ssl = protocol == 'https'
         
+        # Enough kept-alive connections that polls reuse TLS sessions instead of
+        # waiting on the pool or reconnecting, with at least two per worker
+        max_workers = config.get('MAX_CONCURRENCY', 4)
         conn_args = {
             'hosts': [{'host': self.host, 'port': self.port}],
             'use_ssl': use_ssl,
-            'verify_certs': False
+            'verify_certs': False,
+            'pool_maxsize': config.get('POOL_MAXSIZE', max(64, max_workers * 2)),
+            'http_compress': True,
+            'serializer': ORJSONSerializer()
+            # No retry_on_timeout: the transport would re-send the non-idempotent
+            # _execute, while task reads are already retried by the poll backoff
         }
         
         # Add HTTP authentication if credentials are provided
@@ -36,6 +126,7 @@ class OpenSearchClient:
         self.client = OpenSearch(**conn_args)
         
         self.ml_client = MLCommonClient(self.client)
+        self.task_durations = TaskDurationEstimator()
     
     def execute_agent_transport(self, agent_id, question):
         """
@@ -56,19 +147,40 @@ class OpenSearchClient:
             }
         }
         
-        logging.info(f"Executing agent {agent_id} with question: {question}")
+        log.info("Executing agent %s with question: %s", agent_id, question)
         
         try:
             response = self.client.transport.perform_request(
                 "POST", endpoint, body=body
             )
-            logging.info(f"Agent execution initiated successfully with task_id: {response.get('task_id')}")
-            logging.debug(f"Full agent execution response: {json.dumps(response, indent=2)}")
+            log.info("Agent execution initiated successfully with task_id: %s", response.get('task_id'))
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Full agent execution response: %s", _pretty_json(response))
                 
             return response
         except Exception as e:
-            logging.error(f"Error executing agent: {e}")
+            log.error("Error executing agent: %s", e)
             raise
+    
+    def get_tasks_bulk(self, task_ids):
+        """
+        Get several tasks with a single search of the ML Commons task index
+        
+        Search is near real-time, so a task created less than a refresh
+        interval ago may not be returned yet.
+        
+        Args:
+            task_ids (list[str]): The task IDs to get
+            
+        Returns:
+            dict[str, dict]: Task response data by task ID, for the tasks that were found
+        """
+        body = {"query": {"ids": {"values": list(task_ids)}}, "size": len(task_ids)}
+        response = self.client.transport.perform_request(
+            "POST", f"{self.base_uri}/tasks/_search", body=body,
+            params={"filter_path": "hits.hits._id,hits.hits._source"}
+        )
+        return {hit['_id']: hit['_source'] for hit in response.get('hits', {}).get('hits', [])}
 
 def run_agent_async(question, client, agent_id=None):
     """Run agent asynchronously and return task_id
@@ -88,57 +200,341 @@ def run_agent_async(question, client, agent_id=None):
     if not task_id:
         raise ValueError(f"Failed to get task_id from response: {response}")
     
-    logging.info(f"Agent execution started with task_id: {task_id}")
+    log.info("Agent execution started with task_id: %s", task_id)
     return task_id
 
-def fetch_result(task_id, client, poll_interval=10, max_retries=100):
-    """Fetch result using task_id with enhanced polling mechanism
+def _backoff_delay(attempt, base_delay, max_delay):
+    """Truncated exponential backoff delay for a polling attempt, with full jitter
+    
+    Args:
+        attempt (int): 0-based polling attempt
+        base_delay (float): Upper bound in seconds of the delay after the first attempt
+        max_delay (float): Upper bound in seconds of any delay
+        
+    Returns:
+        float: Seconds to sleep before the next attempt, uniform between 0 and
+            min(max_delay, base_delay * 2**attempt)
+    """
+    return random.uniform(0, min(max_delay, base_delay * (1 << min(attempt, 20))))
+
+def _is_transient(error):
+    """Whether a transport error is worth retrying
+    
+    Connection errors, throttling and server errors are; other 4xx responses,
+    such as a task that no longer exists, will not change on a retry.
+    """
+    status = error.status_code
+    return not isinstance(status, int) or status == 429 or status >= 500
+
+def poll_task(task_id, client, start_time, attempt_info="", endpoint=None):
+    """Check the state of an agent task once
+    
+    Only the state is requested; the full task is fetched once it is final.
+    
+    Args:
+        task_id (str): The task ID to check
+        client (OpenSearchClient): The OpenSearch client
+        start_time (float): time.monotonic() when polling of the task started,
+            used to record its duration if the server timestamps are missing
+        attempt_info (str, optional): Appended to the state log line
+        endpoint (str, optional): The task's URL path, for callers polling the
+            same task repeatedly. Built from task_id if not given.
+        
+    Returns:
+        tuple[str, dict]: The task state, and the full task response data if
+            the task reached a terminal state (otherwise None)
+    """
+    endpoint = endpoint or f"{client.base_uri}/tasks/{task_id}"
+    task_data = client.client.transport.perform_request("GET", endpoint, params={"filter_path": "state"})
+    state = task_data.get('state')
+    if state in _TERMINAL:
+        task_data = client.client.transport.perform_request("GET", endpoint)
+    return state, _finished_task(task_id, client, task_data, start_time, attempt_info)
+
+def _finished_task(task_id, client, task_data, start_time, attempt_info):
+    """Log the state of a polled task, returning its data if it reached a terminal state"""
+    state = task_data.get('state')
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Task data%s: %s", attempt_info, _pretty_json(task_data))
+    
+    log.info("Task %s state: %s%s", task_id, state, attempt_info)
+    
+    if state in _PENDING:
+        return None
+    if state == STATE_COMPLETED:
+        log.info("Task %s completed successfully", task_id)
+        create_time_ms = task_data.get('create_time', 0)
+        last_update_time_ms = task_data.get('last_update_time', 0)
+        if create_time_ms > 0 and last_update_time_ms >= create_time_ms:
+            client.task_durations.update((last_update_time_ms - create_time_ms) / 1000)
+        else:
+            client.task_durations.update(time.monotonic() - start_time)
+        return task_data
+    elif state == STATE_FAILED:
+        error_msg = "Unknown error"
+        if 'response' in task_data and 'error_message' in task_data['response']:
+            error_msg = task_data['response']['error_message']
+        log.error("Task %s failed: %s", task_id, error_msg)
+        
+        return task_data
+    elif state in _TERMINAL:
+        log.warning("Task %s ended in state %s", task_id, state)
+        return task_data
+    log.warning("Unknown task state: %s", state)
+    return None
+
+def fetch_result(task_id, client, base_delay=0.5, max_delay=10.0, max_elapsed=600):
+    """Fetch result using task_id, polling with exponential backoff
+    
+    The first poll waits for a fraction of the average duration of recently
+    completed tasks (immediately for the first task). After that, the delay
+    between polls is drawn uniformly from 0 up to a bound that doubles from
+    base_delay to max_delay, starting over when the task changes state.
+    Blocks the calling thread; use TaskPoller to wait for many tasks at once.
     
     Args:
         task_id (str): The task ID to poll for results
         client (OpenSearchClient): The OpenSearch client
-        poll_interval (int, optional): Seconds between polling attempts. Defaults to 5.
-        max_retries (int, optional): Maximum number of polling attempts. Defaults to 60.
+        base_delay (float, optional): Upper bound of the delay after the first poll. Defaults to 0.5.
+        max_delay (float, optional): Upper bound of any delay between polls. Defaults to 10.0.
+        max_elapsed (float, optional): Seconds to wait for the task in total. Defaults to 600.
         
     Returns:
         dict: The task response data
         
     Raises:
-        Exception: If the task fails or times out
+        TimeoutError: If the task does not finish within max_elapsed seconds
+        TransportError: If the task request is rejected, e.g. NotFoundError for
+            an unknown task. Connection errors, 429 and 5xx responses are retried.
     """
-    logging.info(f"Polling for task {task_id} completion")
+    log.info("Polling for task %s completion", task_id)
+    start_time = time.monotonic()
+    deadline = start_time + max_elapsed
+    
+    initial_delay = client.task_durations.initial_delay()
+    if initial_delay:
+        log.info("Waiting %.2f seconds before first poll of task %s based on recent task durations", initial_delay, task_id)
+        time.sleep(min(initial_delay, max_elapsed))
     
-    for attempt in range(max_retries):
+    endpoint = f"{client.base_uri}/tasks/{task_id}"
+    attempt = 0
+    poll_count = 0
+    last_state = None
+    while True:
+        poll_count += 1
         try:
-            endpoint = f"{client.base_uri}/tasks/{task_id}"
-            task_data = client.client.transport.perform_request("GET", endpoint)
+            state, task_data = poll_task(task_id, client, start_time, f" (poll {poll_count})", endpoint=endpoint)
+            if task_data is not None:
+                return task_data
+            if last_state is not None and state != last_state:
+                attempt = 0
+            last_state = state
+        except TransportError as e:
+            if not _is_transient(e):
+                log.error("Error polling task %s: %s", task_id, e)
+                raise
+            log.warning("Transient error polling task %s, backing off: %s", task_id, e)
+        except Exception as e:
+            log.error("Error polling task %s: %s", task_id, e)
+            raise
         
-            logging.debug(f"Task data (attempt {attempt+1}): {json.dumps(task_data, indent=2)}")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        delay = min(_backoff_delay(attempt, base_delay, max_delay), remaining)
+        attempt += 1
+        log.info("Task %s not finished. Waiting %.2f seconds before checking again.", task_id, delay)
+        time.sleep(delay)
+    
+    raise TimeoutError(f"Task {task_id} did not complete within {max_elapsed:g} seconds ({poll_count} polls)")
 
-            state = task_data.get('state')
-            logging.info(f"Task {task_id} state: {state} (attempt {attempt+1}/{max_retries})")
+class TaskPoller:
+    """Waits for many agent tasks from a fixed number of polling threads
+    
+    Tasks are kept in a min-heap ordered by the time of their next poll, with
+    the same schedule as fetch_result. Each polling thread sleeps until the
+    earliest poll is due, then takes up to batch_size tasks due within the
+    next coalesce seconds off the heap and reads their states with a single
+    get_tasks_bulk request. The Future of each task is resolved once it
+    finished, so neither the number of threads nor the number of requests
+    grows with the number of tasks in flight.
+    """
+    def __init__(self, client, workers=1, batch_size=20, coalesce=0.25,
+                 base_delay=0.5, max_delay=10.0, max_elapsed=600):
+        self.client = client
+        self.batch_size = max(1, batch_size)
+        self.coalesce = coalesce
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+        # Entries are (next_poll_time, sequence, task); the sequence breaks ties
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"TaskPoller-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def submit(self, task_id):
+        """Start waiting for a task
+        
+        Args:
+            task_id (str): The task ID to poll for results
             
-            if state == 'COMPLETED':
-                logging.info(f"Task {task_id} completed successfully")
-                return task_data
-            elif state == 'FAILED':
-                error_msg = "Unknown error"
-                if 'response' in task_data and 'error_message' in task_data['response']:
-                    error_msg = task_data['response']['error_message']
-                logging.error(f"Task {task_id} failed: {error_msg}")
-
-                return task_data
-            elif state == 'RUNNING' or state == 'CREATED':
-                logging.info(f"Task {task_id} is {state}. Waiting {poll_interval} seconds before checking again.")
-                time.sleep(poll_interval)
-            else:
-                logging.warning(f"Unknown task state: {state}")
-                time.sleep(poll_interval)
+        Returns:
+            Future: Resolves to the task response data. Raises TimeoutError, or
+                the error of a request that should not be retried, as fetch_result does
+        """
+        log.info("Polling for task %s completion", task_id)
+        start_time = time.monotonic()
+        task = {
+            'task_id': task_id,
+            'endpoint': f"{self.client.base_uri}/tasks/{task_id}",
+            'future': Future(),
+            'start_time': start_time,
+            'deadline': start_time + self.max_elapsed,
+            'attempt': 0,
+            'poll_count': 0,
+            'last_state': None
+        }
+        
+        initial_delay = self.client.task_durations.initial_delay()
+        if initial_delay:
+            log.info("Waiting %.2f seconds before first poll of task %s based on recent task durations", initial_delay, task_id)
+        self._schedule(min(start_time + initial_delay, task['deadline']), task)
+        return task['future']
+    
+    def close(self):
+        """Stop the polling threads, cancelling tasks that are still being polled"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        for _, _, task in self._heap:
+            task['future'].cancel()
+        self._heap.clear()
+    
+    def _schedule(self, poll_time, task):
+        with self._condition:
+            heapq.heappush(self._heap, (poll_time, next(self._sequence), task))
+            self._condition.notify()
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed and (not self._heap or self._heap[0][0] > time.monotonic()):
+                    self._condition.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                if self._closed:
+                    return
+                # Polls due shortly are moved up so they share the request
+                horizon = time.monotonic() + self.coalesce
+                tasks = [heapq.heappop(self._heap)[2]]
+                while len(tasks) < self.batch_size and self._heap and self._heap[0][0] <= horizon:
+                    tasks.append(heapq.heappop(self._heap)[2])
+                # Another thread may be waiting for the task now at the top
+                if self._heap:
+                    self._condition.notify()
+            try:
+                if len(tasks) > 1:
+                    self._poll_bulk(tasks)
+                else:
+                    self._poll(tasks[0])
+            except Exception as e:
+                # Fail the tasks rather than losing the thread, which would leave
+                # their futures unresolved and their deadlines unchecked
+                log.exception("Unexpected error polling %s tasks", len(tasks))
+                for task in tasks:
+                    if not task['future'].done():
+                        task['future'].set_exception(e)
+    
+    def _poll(self, task):
+        task['poll_count'] += 1
+        try:
+            state, task_data = poll_task(task['task_id'], self.client, task['start_time'], f" (poll {task['poll_count']})",
+                                         endpoint=task['endpoint'])
+        except Exception as e:
+            self._poll_failed(task, e)
+            return
+        self._update(task, state, task_data)
+    
+    def _poll_bulk(self, tasks):
+        try:
+            found = self.client.get_tasks_bulk([task['task_id'] for task in tasks])
+        except TransportError as e:
+            if _is_transient(e):
+                log.warning("Transient error polling %s tasks, backing off: %s", len(tasks), e)
+                for task in tasks:
+                    task['poll_count'] += 1
+                    self._reschedule(task)
+                return
+            log.warning("Bulk task polling is not available, polling tasks one by one: %s", e)
+            self.batch_size = 1
+            for task in tasks:
+                self._poll(task)
+            return
         except Exception as e:
-            logging.error(f"Error polling task {task_id}: {e}")
-            time.sleep(poll_interval)
+            log.warning("Error polling %s tasks in bulk, polling them one by one: %s", len(tasks), e)
+            for task in tasks:
+                self._poll(task)
+            return
+        
+        for task in tasks:
+            task_id = task['task_id']
+            task['poll_count'] += 1
+            task_data = found.get(task_id)
+            if task_data is None:
+                log.info("Task %s not searchable yet (poll %s)", task_id, task['poll_count'])
+                self._reschedule(task)
+                continue
+            try:
+                state = task_data.get('state')
+                finished = _finished_task(task_id, self.client, task_data, task['start_time'], f" (poll {task['poll_count']})")
+            except Exception as e:
+                self._poll_failed(task, e)
+                continue
+            self._update(task, state, finished)
     
-    raise TimeoutError(f"Task {task_id} did not complete within {max_retries * poll_interval} seconds")
+    def _poll_failed(self, task, error):
+        task_id = task['task_id']
+        if isinstance(error, TransportError) and _is_transient(error):
+            log.warning("Transient error polling task %s, backing off: %s", task_id, error)
+            self._reschedule(task)
+            return
+        log.error("Error polling task %s: %s", task_id, error)
+        task['future'].set_exception(error)
+    
+    def _update(self, task, state, task_data):
+        if task_data is not None:
+            task['future'].set_result(task_data)
+            return
+        if task['last_state'] is not None and state != task['last_state']:
+            task['attempt'] = 0
+        task['last_state'] = state
+        self._reschedule(task)
+    
+    def _reschedule(self, task):
+        task_id = task['task_id']
+        remaining = task['deadline'] - time.monotonic()
+        if remaining <= 0:
+            task['future'].set_exception(TimeoutError(
+                f"Task {task_id} did not complete within {self.max_elapsed:g} seconds ({task['poll_count']} polls)"
+            ))
+            return
+        delay = min(_backoff_delay(task['attempt'], self.base_delay, self.max_delay), remaining)
+        task['attempt'] += 1
+        log.info("Task %s not finished. Checking again in %.2f seconds.", task_id, delay)
+        self._schedule(time.monotonic() + delay, task)
 
 def process_output(task_data):
     """Process the raw output from the task
@@ -149,10 +545,10 @@ def process_output(task_data):
     Returns:
         dict: Processed output with key components extracted
     """
-    logging.info("Processing task output data")
+    log.info("Processing task output data")
     
     if not task_data:
-        logging.warning("Empty task data received")
+        log.warning("Empty task data received")
         return {"error": "No task data available"}
 
     state = task_data.get('state')
@@ -169,90 +565,130 @@ def process_output(task_data):
         "executor_agent_parent_interaction_id": response.get('executor_agent_parent_interaction_id', ''),
     }
     
+    response_content_value = ''
     # Handle the case when the task is COMPLETED
-    if state == 'COMPLETED' and 'inference_results' in response:
+    if state == STATE_COMPLETED and 'inference_results' in response:
         try:
             inference_results = response.get('inference_results', [{}])[0]
             output_items = inference_results.get('output', [])
             
-            for item in output_items:
-                if item.get('name') == 'response' and 'dataAsMap' in item:
-                    response_content = item['dataAsMap'].get('response', '')
-                    response_content_value = response_content
-                    break
-            
+            response_content_value = next(
+                (item['dataAsMap'].get('response') or '' for item in output_items
+                 if item.get('name') == 'response' and 'dataAsMap' in item),
+                ''
+            )
             if not response_content_value:
-                response_content_value = ''
-                logging.warning("Could not find response content in the expected format")
+                log.warning("Could not find response content in the expected format")
         except Exception as e:
-            logging.error(f"Error extracting response content: {e}")
-            response_content_value = ''
+            log.error("Error extracting response content: %s", e)
             processed_output['extraction_error'] = str(e)
-    elif state == 'FAILED':
+    elif state == STATE_FAILED:
         processed_output['error_message'] = response.get('error_message', 'Unknown error')
-        response_content_value = ''
-    else:
-        response_content_value = ''
     
-    logging.info(f"Processed output: {json.dumps(processed_output, indent=2)}")
+    log.info("Processed output: state=%s, memory_id=%s, response length=%s", state, processed_output['memory_id'], len(response_content_value))
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Processed output: %s", _pretty_json(processed_output))
     # Store the response content in a separate field for evaluation
     processed_output['_response_content'] = response_content_value
     return processed_output
 
-def evaluate_result(actual_output, expected_output):
-    """Evaluate actual output against expected output using Amazon Bedrock
+def _init_evaluation(actual_output, expected_output):
+    """Build the evaluation record for an output, before any Bedrock rating
     
     Args:
         actual_output (dict): The processed output from the agent
         expected_output (str): The expected output to compare against
         
     Returns:
-        dict: Evaluation results with Bedrock ratings
+        dict: Evaluation with state, success flag and actual/expected outputs
     """
-    logging.info("Evaluating agent output using Amazon Bedrock")
     state = actual_output.get('state', '')
     evaluation = {
         "expected_output": expected_output,
         "state": state
     }
 
-    if state == 'FAILED':
+    if state == STATE_FAILED:
         evaluation["error_message"] = actual_output.get('error_message', 'Unknown error')
         evaluation["success"] = False
         evaluation["actual_output"] = ""
-        logging.warning(f"Task failed: {evaluation['error_message']}")
+        log.warning("Task failed: %s", evaluation['error_message'])
         return evaluation
         
-    actual_output_value = actual_output.get('_response_content', '')
-    evaluation["actual_output"] = actual_output_value
-    evaluation["success"] = state == 'COMPLETED'
+    evaluation["actual_output"] = actual_output.get('_response_content', '')
+    evaluation["success"] = state == STATE_COMPLETED
+    return evaluation
+
+def _log_evaluation(evaluation):
+    """Log the outcome of an evaluation"""
+    log_level = logging.INFO if evaluation["success"] else logging.WARNING
+    rating_info = f", rating={evaluation.get('rating', 'N/A')}/5" if "rating" in evaluation else ""
+    log.log(log_level, "Evaluation results: success=%s%s", evaluation['success'], rating_info)
+
+def evaluate_result(actual_output, expected_output):
+    """Evaluate actual output against expected output using Amazon Bedrock
+    
+    Args:
+        actual_output (dict): The processed output from the agent
+        expected_output (str): The expected output to compare against
+        
+    Returns:
+        dict: Evaluation results with Bedrock ratings
+    """
+    return evaluate_results([(actual_output, expected_output)])[0]
+
+def evaluate_results(outputs):
+    """Evaluate several outputs with a single batched Bedrock request
+    
+    Args:
+        outputs (list[tuple[dict, str]]): (processed_output, expected_output) pairs
+        
+    Returns:
+        list[dict]: Evaluation results in the same order as outputs
+    """
+    log.info("Evaluating %s agent outputs using Amazon Bedrock", len(outputs))
+    evaluations = [_init_evaluation(actual_output, expected_output) for actual_output, expected_output in outputs]
+    to_rate = [evaluation for evaluation in evaluations if evaluation["success"]]
     
-    if evaluation["success"]:
+    if to_rate:
+        # Identical (actual, expected) pairs are only rated once
+        unique_pairs = list(dict.fromkeys((evaluation["actual_output"], evaluation["expected_output"]) for evaluation in to_rate))
         try:
-            logging.info("Sending to Bedrock for evaluation")
-            bedrock_evaluation = evaluate_with_bedrock(
-                actual_output_value,
-                expected_output
-            )
-            evaluation.update(bedrock_evaluation)
-            if "rating" in evaluation:
-                logging.info(f"Bedrock evaluation rating: {evaluation['rating']}/5")
-            else:
-                logging.warning("Bedrock evaluation did not return a rating")
-                
+            log.info("Sending batch of %s to Bedrock for evaluation", len(unique_pairs))
+            bedrock_evaluations = dict(zip(unique_pairs, evaluate_batch_with_cache(unique_pairs)))
+            for evaluation in to_rate:
+                evaluation.update(bedrock_evaluations[(evaluation["actual_output"], evaluation["expected_output"])])
         except Exception as e:
-            logging.error(f"Error during Bedrock evaluation: {e}")
-            evaluation["bedrock_error"] = str(e)
+            log.error("Error during batched Bedrock evaluation: %s", e)
+            for evaluation in to_rate:
+                evaluation["bedrock_error"] = str(e)
     
-    log_level = logging.INFO if evaluation["success"] else logging.WARNING
-    rating_info = f", rating={evaluation.get('rating', 'N/A')}/5" if "rating" in evaluation else ""
-    logging.log(log_level, f"Evaluation results: success={evaluation['success']}{rating_info}")
+    for evaluation in evaluations:
+        _log_evaluation(evaluation)
+    return evaluations
+
+def evaluate_tests(results):
+    """Evaluate completed test results in one batch, updating them in place
     
-    return evaluation
+    Args:
+        results (list[dict]): Completed results from completed_group_results, carrying
+            their test case's expected output under '_expected_output'
+            
+    Returns:
+        list[dict]: The same results, each with an 'evaluation'
+    """
+    evaluations = evaluate_results([(r['processed_output'], r.pop('_expected_output')) for r in results])
+    for result, evaluation in zip(results, evaluations):
+        result['evaluation'] = evaluation
+    return results
 
 def check_cluster_connectivity(client):
     """Check if OpenSearch cluster is accessible
     
+    A HEAD / ping is enough to check the connection. The ML Commons task API
+    is then called once for a task that does not exist, so the connection
+    and the server's code path are warm before polling starts.
+    
     Args:
         client (OpenSearchClient): The OpenSearch client
         
@@ -260,13 +696,20 @@ def check_cluster_connectivity(client):
         bool: True if connected, False otherwise
     """
     try:
-        logging.info("Checking OpenSearch cluster connectivity...")
-        client.client.cat.health(format="json", v=True)
-        logging.info("Successfully connected to OpenSearch cluster")
-        return True
+        log.info("Checking OpenSearch cluster connectivity...")
+        if not client.client.ping():
+            log.error("Error connecting to OpenSearch cluster: ping failed")
+            return False
+        log.info("Successfully connected to OpenSearch cluster")
     except Exception as e:
-        logging.error(f"Error connecting to OpenSearch cluster: {e}")
+        log.error("Error connecting to OpenSearch cluster: %s", e)
         return False
+    
+    try:
+        client.client.transport.perform_request("GET", f"{client.base_uri}/tasks/_warmup", params={"ignore": 404})
+    except Exception as e:
+        log.warning("Could not warm up the ML Commons task API: %s", e)
+    return True
 
 def fetch_agent_details(client, agent_id):
     """Fetch agent details from the OpenSearch API
@@ -279,14 +722,15 @@ def fetch_agent_details(client, agent_id):
         dict: Agent details including name, type, tools, parameters, etc.
     """
     try:
-        logging.info(f"Fetching details for agent {agent_id}")
+        log.info("Fetching details for agent %s", agent_id)
         endpoint = f"{client.base_uri}/agents/{agent_id}"
         agent_data = client.client.transport.perform_request("GET", endpoint)
-        logging.info(f"Successfully fetched details for agent {agent_id}")
-        logging.debug(f"Agent details: {json.dumps(agent_data, indent=2)}")
+        log.info("Successfully fetched details for agent %s", agent_id)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Agent details: %s", _pretty_json(agent_data))
         return agent_data
     except Exception as e:
-        logging.error(f"Error fetching agent details: {e}")
+        log.error("Error fetching agent details: %s", e)
         return None
 
 def write_result(results, output_file):
@@ -300,50 +744,328 @@ def write_result(results, output_file):
         bool: True if successful, False otherwise
     """
     try:
-        import os
-        import json as json_lib
-        
-        # Process the results to filter out internal fields
-        filtered_results = json_lib.loads(json.dumps(results, default=str))
+        # Shallow copies without internal fields; the results themselves are left untouched
+        filtered_results = {**results, "tests": [_public_test(test) for test in results.get("tests", [])]}
         
-        # Remove internal fields from the output
-        for test in filtered_results.get("tests", []):
-            if "processed_output" in test and "_response_content" in test["processed_output"]:
-                del test["processed_output"]["_response_content"]
-                
         os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else '.', exist_ok=True)
-        with open(output_file, 'w') as f:
-            json.dump(filtered_results, f, indent=2, default=str) 
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(filtered_results, option=orjson.OPT_INDENT_2, default=str))
             
-        logging.info(f"Results written to {output_file}")
+        log.info("Results written to %s", output_file)
         return True
     except Exception as e:
-        logging.error(f"Error writing results to {output_file}: {e}")
+        log.error("Error writing results to %s: %s", output_file, e)
         return False
 
+def _public_test(test):
+    """Return a copy of a test result without internal fields
+    
+    Args:
+        test (dict): A test result from run_tests
+        
+    Returns:
+        dict: The result without '_expected_output' and '_response_content'
+    """
+    public = {k: v for k, v in test.items() if k != '_expected_output'}
+    if isinstance(public.get('processed_output'), dict):
+        public['processed_output'] = {
+            k: v for k, v in public['processed_output'].items() if k != '_response_content'
+        }
+    return public
+
+def append_results(tests, stream):
+    """Append finished test results to a JSONL stream, one record per line
+    
+    The lines are synced to disk before returning, so finished tests survive
+    a crash of the benchmark or the machine.
+    
+    Args:
+        tests (list[dict]): Finished test results
+        stream (file): JSONL file opened in binary write/append mode
+    """
+    stream.write(b"".join(orjson.dumps(_public_test(test), default=str) + b"\n" for test in tests))
+    stream.flush()
+    os.fsync(stream.fileno())
+
+class SummaryAccumulator:
+    """Running summary statistics, updated once per finished test
+    
+    Test cases with the same input share one agent task, so the total time
+    counts the execution time of each task once.
+    """
+    def __init__(self):
+        self.completed_tests = 0
+        self.failed_tests = 0
+        self.rating_sum = 0
+        self.rated_tests = 0
+        self.total_time = 0
+        self._timed_tasks = set()
+    
+    def add(self, test):
+        """Count a finished test result"""
+        status = test['status']
+        if status == 'completed':
+            self.completed_tests += 1
+            evaluation = test.get('evaluation', {})
+            if 'rating' in evaluation:
+                self.rating_sum += evaluation['rating']
+                self.rated_tests += 1
+        elif status == 'failed':
+            self.failed_tests += 1
+        task_id = test.get('task_id')
+        if task_id not in self._timed_tasks:
+            if task_id is not None:
+                self._timed_tasks.add(task_id)
+            self.total_time += test.get('execution_time_seconds', 0)
+    
+    def summary(self, total_tests):
+        """Summary with test counts, average rating and total time"""
+        average_rating = self.rating_sum / self.rated_tests if self.rated_tests else 0
+        return {
+            "total_tests": total_tests,
+            "completed_tests": self.completed_tests,
+            "failed_tests": self.failed_tests,
+            "average_rating": round(average_rating, 2),
+            "total_time_seconds": round(self.total_time, 2)
+        }
+
+def summarize_tests(tests, total_tests):
+    """Compute the summary statistics for a list of test results
+    
+    Args:
+        tests (list[dict]): Test results
+        total_tests (int): Number of test cases in the benchmark
+        
+    Returns:
+        dict: Summary with test counts, average rating and total time
+    """
+    totals = SummaryAccumulator()
+    for test in tests:
+        totals.add(test)
+    return totals.summary(total_tests)
+
+def merge_jsonl_to_json(output_file, total_tests=None):
+    """Rebuild the full results file from its header and JSONL stream
+    
+    Useful when a run was interrupted before the final results were written.
+    
+    Args:
+        output_file (str): Path to the results file; tests are read from
+            '<output_file>.jsonl'
+        total_tests (int, optional): Number of test cases in the benchmark.
+            Defaults to the number of records in the stream.
+            
+    Returns:
+        dict: The merged results
+    """
+    with open(output_file, 'rb') as f:
+        results = orjson.loads(f.read())
+    with open(f"{output_file}.jsonl", 'rb') as f:
+        tests = [orjson.loads(line) for line in f if line.strip()]
+    
+    results["tests"] = sorted(tests, key=lambda r: r['test_id'])
+    results["summary"] = summarize_tests(results["tests"], total_tests if total_tests is not None else len(tests))
+    write_result(results, output_file)
+    return results
+
+def completed_group_results(test_group, task_id, task_data, execution_time):
+    """Build the results for test cases that shared one finished agent task
+    
+    Evaluation is left to evaluate_tests, so it can overlap with later agent runs.
+    
+    Args:
+        test_group (list[tuple[int, dict]]): (test_num, test_case) pairs whose
+            test cases all have the same 'input'
+        task_id (str): The task ID of the agent execution
+        task_data (dict): The task response data
+        execution_time (float): Seconds from submitting the task until it was
+            seen to have finished, as measured by the client
+        
+    Returns:
+        list[dict]: One result per test case with status 'completed', carrying
+            '_expected_output' for evaluate_tests
+    """
+    question = test_group[0][1]['input']
+    # The server's create_time/last_update_time stay available in processed_output
+    log.info("Task execution time: %.2fs (created: %s, completed: %s)",
+             execution_time, task_data.get('create_time', 0), task_data.get('last_update_time', 0))
+    
+    processed_output = process_output(task_data)
+    return [
+        {
+            'test_id': num,
+            'input': question,
+            'task_id': task_id,
+            'execution_time_seconds': round(execution_time, 2),
+            'processed_output': processed_output,
+            'status': 'completed',
+            '_expected_output': test_case['expected_output']
+        }
+        for num, test_case in test_group
+    ]
+
+def failed_group_results(test_group, error):
+    """Build failed results for test cases that shared an agent execution
+    
+    Args:
+        test_group (list[tuple[int, dict]]): (test_num, test_case) pairs
+        error (Exception): The error that stopped the agent execution
+        
+    Returns:
+        list[dict]: One result per test case with status 'failed'
+    """
+    test_num = test_group[0][0]
+    question = test_group[0][1]['input']
+    shared_with = [str(num) for num, _ in test_group[1:]]
+    shared_info = f" (shared with tests {', '.join(shared_with)})" if shared_with else ""
+    log.error("Error in test %s%s: %s", test_num, shared_info, error)
+    return [
+        {
+            'test_id': num,
+            'input': question,
+            'error': str(error),
+            'status': 'failed'
+        }
+        for num, _ in test_group
+    ]
+
+def run_tests(test_groups, client, config, stream, total_tests, totals):
+    """Run test groups against the agent, evaluate and stream their results
+    
+    Up to MAX_CONCURRENCY agent tasks are in flight at a time. Worker threads
+    only start agent tasks, so the next ones are submitted as soon as earlier
+    ones finish; POLL_WORKERS TaskPoller threads wait for all of them.
+    Finished results are evaluated in batches of BATCH_SIZE on a separate
+    pool, so evaluating one test overlaps with the agent executing the next
+    ones. Every finished test is appended to the JSONL stream.
+    
+    Args:
+        test_groups (list[list[tuple[int, dict]]]): Test cases grouped by input,
+            as (test_num, test_case) pairs
+        client (OpenSearchClient): The OpenSearch client
+        config (dict): Benchmark configuration
+        stream (file): Binary file the JSONL stream is appended to
+        total_tests (int): Total number of test cases, used for logging
+        totals (SummaryAccumulator): Updated with every finished test
+        
+    Returns:
+        list[dict]: The results of all test cases, in completion order
+    """
+    max_workers = config.get('MAX_CONCURRENCY', 4)
+    eval_workers = config.get('EVAL_CONCURRENCY', max_workers)
+    batch_size = max(1, config.get('BATCH_SIZE', 1))
+    poll_workers = config.get('POLL_WORKERS', 1)
+    poll_batch_size = config.get('POLL_BATCH_SIZE', 20)
+    log.info("Running tests with up to %s concurrent agent tasks", max_workers)
+    
+    results = []
+    pending_evaluation = []
+    remaining_groups = iter(test_groups)
+    start_futures = {}
+    poll_futures = {}
+    eval_futures = set()
+    
+    def finish(tests):
+        append_results(tests, stream)
+        for test in tests:
+            totals.add(test)
+    
+    with TaskPoller(client, workers=poll_workers, batch_size=poll_batch_size) as poller, \
+            ThreadPoolExecutor(max_workers=max_workers) as agent_executor, \
+            ThreadPoolExecutor(max_workers=eval_workers) as eval_executor:
+        def start_next_group():
+            test_group = next(remaining_groups, None)
+            if test_group is None:
+                return
+            test_num, first_case = test_group[0]
+            shared_with = [str(num) for num, _ in test_group[1:]]
+            shared_info = f" (shared with tests {', '.join(shared_with)})" if shared_with else ""
+            log.info("\n======= Executing Test %s/%s%s =======", test_num, total_tests, shared_info)
+            log.info("Question: %s", first_case['input'])
+            start_futures[agent_executor.submit(run_agent_async, first_case['input'], client)] = (test_group, time.perf_counter())
+        
+        for _ in range(max_workers):
+            start_next_group()
+        
+        # Futures are handled on this thread only, so no locking is needed
+        while start_futures or poll_futures or eval_futures:
+            done, _ = wait(start_futures.keys() | poll_futures.keys() | eval_futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in eval_futures:
+                    eval_futures.remove(future)
+                    finish(future.result())
+                    continue
+                
+                if future in start_futures:
+                    test_group, start_time = start_futures.pop(future)
+                    try:
+                        task_id = future.result()
+                    except Exception as e:
+                        finished = failed_group_results(test_group, e)
+                    else:
+                        poll_futures[poller.submit(task_id)] = (test_group, task_id, start_time)
+                        continue
+                else:
+                    test_group, task_id, start_time = poll_futures.pop(future)
+                    try:
+                        finished = completed_group_results(test_group, task_id, future.result(), time.perf_counter() - start_time)
+                    except Exception as e:
+                        finished = failed_group_results(test_group, e)
+                start_next_group()
+                
+                for result in finished:
+                    results.append(result)
+                    log.info("Test %s status: %s (%s/%s done)", result['test_id'], result['status'], len(results), total_tests)
+                    if '_expected_output' in result:
+                        pending_evaluation.append(result)
+                    else:
+                        finish([result])
+            
+            # Flush full batches, and whatever is left once all agent runs are done
+            agents_done = not start_futures and not poll_futures
+            while len(pending_evaluation) >= batch_size or (pending_evaluation and agents_done):
+                batch, pending_evaluation = pending_evaluation[:batch_size], pending_evaluation[batch_size:]
+                eval_futures.add(eval_executor.submit(evaluate_tests, batch))
+    
+    return results
+
+# Agent details copied into the results, when the agent has them
+_AGENT_FIELDS = (
+    'name',
+    'type',
+    'description',
+    'llm',
+    'tools',
+    'parameters',
+    'memory',
+    'created_time',
+    'last_updated_time'
+)
+
 def main():
     with open('config.yaml', 'r') as file:
-        config = yaml.safe_load(file)
+        config = yaml.load(file, Loader=SafeLoader)
+    host, port, agent_id = config['OPENSEARCH_HOST'], config['OPENSEARCH_PORT'], config['AGENT_ID']
 
     client = OpenSearchClient(config)
     
-    logging.info(f"Host: {config['OPENSEARCH_HOST']}")
-    logging.info(f"Port: {config['OPENSEARCH_PORT']}")
-    logging.info(f"Agent ID: {config['AGENT_ID']}")
+    log.info("Host: %s", host)
+    log.info("Port: %s", port)
+    log.info("Agent ID: %s", agent_id)
     
     output_file = config.get('OUTPUT_FILE', 'benchmark_results.json')
-    logging.info("Using Amazon Bedrock for agent response evaluation")
+    log.info("Using Amazon Bedrock for agent response evaluation")
     
     if not check_cluster_connectivity(client):
-        logging.error("Cannot connect to OpenSearch cluster. Please check if the server is running and accessible.")
-        logging.error(f"Connection details: {config['OPENSEARCH_HOST']}:{config['OPENSEARCH_PORT']}")
-        logging.error("Exiting benchmark...")
+        log.error("Cannot connect to OpenSearch cluster. Please check if the server is running and accessible.")
+        log.error("Connection details: %s:%s", host, port)
+        log.error("Exiting benchmark...")
         results = {
             "timestamp": int(time.time()),
             "config": {
-                "host": config['OPENSEARCH_HOST'],
-                "port": config['OPENSEARCH_PORT'],
-                "agent_id": config['AGENT_ID']
+                "host": host,
+                "port": port,
+                "agent_id": agent_id
             },
             "agent_info": {},
             "error": "Cannot connect to OpenSearch cluster",
@@ -363,108 +1085,55 @@ def main():
     with open(test_cases_file, 'r') as test_file:
         test_cases = json.load(test_file)
     
-    logging.info(f"Loaded {len(test_cases)} test cases from {test_cases_file}")
+    log.info("Loaded %s test cases from %s", len(test_cases), test_cases_file)
+    precompute_embeddings(test_cases)
     
     # Fetch agent details
-    agent_id = config['AGENT_ID']
     agent_details = fetch_agent_details(client, agent_id)
     
-    agent_info = {}
-    if agent_details:
-        # Extract relevant agent information
-        if 'name' in agent_details:
-            agent_info['name'] = agent_details.get('name', '')
-        if 'type' in agent_details:
-            agent_info['type'] = agent_details.get('type', '')
-        if 'description' in agent_details:
-            agent_info['description'] = agent_details.get('description', '')
-        if 'llm' in agent_details:
-            agent_info['llm'] = agent_details.get('llm', {})
-        if 'tools' in agent_details:
-            agent_info['tools'] = agent_details.get('tools', [])
-        if 'parameters' in agent_details:
-            agent_info['parameters'] = agent_details.get('parameters', {})
-        if 'memory' in agent_details:
-            agent_info['memory'] = agent_details.get('memory', {})
-        if 'created_time' in agent_details:
-            agent_info['created_time'] = agent_details.get('created_time', 0)
-        if 'last_updated_time' in agent_details:
-            agent_info['last_updated_time'] = agent_details.get('last_updated_time', 0)
+    # Extract relevant agent information
+    agent_info = {field: agent_details[field] for field in _AGENT_FIELDS if field in agent_details} if agent_details else {}
     
     results = {
         "timestamp": int(time.time()),
         "config": {
-            "host": config['OPENSEARCH_HOST'],
-            "port": config['OPENSEARCH_PORT'],
-            "agent_id": config['AGENT_ID']
+            "host": host,
+            "port": port,
+            "agent_id": agent_id
         },
         "agent_info": agent_info,
         "tests": []
     }
     
+    # Config and agent info go out up front; each finished test is then appended
+    # to the JSONL stream instead of rewriting the whole results file
+    write_result(results, output_file)
+    stream_file = f"{output_file}.jsonl"
+    
+    # The agent runs once per unique input; duplicates reuse its output
+    test_groups = {}
     for i, test_case in enumerate(test_cases):
-        test_num = i + 1
-        logging.info(f"\n======= Executing Test {test_num}/{len(test_cases)} =======")
-        logging.info(f"Question: {test_case['input']}")
-        
-        try:
-            task_id = run_agent_async(test_case['input'], client)
-            task_data = fetch_result(task_id, client)
-            
-            create_time_ms = task_data.get('create_time', 0)
-            last_update_time_ms = task_data.get('last_update_time', 0)
-            
-            create_time = create_time_ms / 1000
-            last_update_time = last_update_time_ms / 1000
-            execution_time = last_update_time - create_time if create_time > 0 else 0
-            
-            logging.info(f"Task execution time: {execution_time:.2f}s (created: {create_time_ms}, completed: {last_update_time_ms})")
-            
-            processed_output = process_output(task_data)
-            evaluation = evaluate_result(processed_output, test_case['expected_output'])
-            result = {
-                'test_id': test_num,
-                'input': test_case['input'],
-                'task_id': task_id,
-                'execution_time_seconds': round(execution_time, 2),
-                'processed_output': processed_output,
-                'evaluation': evaluation,
-                'status': 'completed'
-            }
-        except Exception as e:
-            logging.error(f"Error in test {test_num}: {e}")
-            result = {
-                'test_id': test_num,
-                'input': test_case['input'],
-                'error': str(e),
-                'status': 'failed'
-            }
-        
-        results["tests"].append(result)
-        logging.info(f"Test {test_num} status: {result['status']}")
-        write_result(results, output_file)
+        test_groups.setdefault(test_case['input'], []).append((i + 1, test_case))
+    if len(test_groups) < len(test_cases):
+        log.info("%s test cases share %s unique inputs", len(test_cases), len(test_groups))
     
-    # summary
-    completed_tests = sum(1 for r in results["tests"] if r['status'] == 'completed')
-    failed_tests = sum(1 for r in results["tests"] if r['status'] == 'failed')
-    rated_tests = [r for r in results["tests"] if r.get('status') == 'completed' and 'rating' in r.get('evaluation', {})]
-    average_rating = sum(r.get('evaluation', {}).get('rating', 0) for r in rated_tests) / len(rated_tests) if rated_tests else 0
-    results["summary"] = {
-        "total_tests": len(test_cases),
-        "completed_tests": completed_tests,
-        "failed_tests": failed_tests,
-        "average_rating": round(average_rating, 2),
-        "total_time_seconds": round(sum(r.get('execution_time_seconds', 0) for r in results["tests"]), 2)
-    }
+    totals = SummaryAccumulator()
+    with open(stream_file, 'wb') as stream:
+        results["tests"] = run_tests(list(test_groups.values()), client, config, stream, len(test_cases), totals)
+    
+    save_cache()
+    results["tests"].sort(key=lambda r: r['test_id'])
+    results["summary"] = totals.summary(len(test_cases))
+    summary = results["summary"]
     
     write_result(results, output_file)
     
-    logging.info(f"\n======= Benchmark Complete =======")
-    logging.info(f"Total tests: {len(test_cases)}")
-    logging.info(f"Successful tests: {completed_tests}")
-    logging.info(f"Failed tests: {failed_tests}")
-    logging.info(f"Average rating: {average_rating:.2f}/5")
-    logging.info(f"Results written to {output_file}")
+    log.info("\n======= Benchmark Complete =======")
+    log.info("Total tests: %s", len(test_cases))
+    log.info("Successful tests: %s", summary['completed_tests'])
+    log.info("Failed tests: %s", summary['failed_tests'])
+    log.info("Average rating: %.2f/5", summary['average_rating'])
+    log.info("Results written to %s", output_file)
     
     return results
 